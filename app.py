@@ -15,36 +15,34 @@
 import os
 import io
 import re
+import json
+import math
+import time
+import hashlib
+import contextlib
+from collections import Counter
 from datetime import datetime
 from typing import List, Tuple, Dict
 
 import streamlit as st
 
-# Optional deps; handle gracefully if missing
-try:
-    from docx import Document
-    from docx.shared import Pt
-    from docx.oxml.ns import qn
-except Exception:
-    Document = None  # type: ignore
-
-try:
-    from pypdf import PdfReader
-except Exception:
-    PdfReader = None  # type: ignore
-
-# OpenAI (new SDK style)
-try:
-    from openai import OpenAI
-    _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-except Exception:
-    _client = None
-
 APP_TITLE = "Neogen Interview Questions Generator"
 HOUSE_STYLE_NAME = "Neogen House Style"
 
 st.set_page_config(page_title=APP_TITLE, page_icon="🧠", layout="wide")
 
+# Optional deps (python-docx, PyMuPDF/pypdf, openai) are imported lazily where they
+# are used, so a cold start doesn't pay for parsers the session never touches.
+
+@st.cache_resource(show_spinner=False)
+def _get_client():
+    # OpenAI (new SDK style); None keeps the demo fallback working
+    try:
+        from openai import OpenAI
+        return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    except Exception:
+        return None
+
 # ---------------------------
 # Logo utilities
 # ---------------------------
@@ -78,26 +76,47 @@ header()
 # Text extraction
 # ---------------------------
 
+def _pdf_text_pymupdf(data: bytes) -> str:
+    import fitz  # PyMuPDF
+
+    # Text layer only (no OCR), so scanned PDFs come back empty.
+    # Pages are read serially on purpose: PyMuPDF isn't thread-safe and holds the GIL,
+    # so a thread pool would add risk without any speed-up.
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return "\n".join(page.get_text("text") for page in doc)
+
 def extract_text_from_upload(upload) -> str:
     if upload is None:
         return ""
-    name = upload.name.lower()
-    data = upload.read()
+    # UploadedFile isn't hashable, so cache on its bytes + name instead
+    return _extract_cached(upload.getvalue(), upload.name)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _extract_cached(data: bytes, name: str) -> str:
+    name = name.lower()
     if name.endswith(".txt") or name.endswith(".md"):
         try:
             return data.decode("utf-8")
         except Exception:
             return data.decode("latin-1", errors="ignore")
     if name.endswith(".docx"):
-        if Document is None:
+        try:
+            from docx import Document
+        except ImportError:
             st.error("python-docx not installed. Add `python-docx` to requirements.txt and redeploy.")
             return ""
         file_like = io.BytesIO(data)
         doc = Document(file_like)
         return "\n".join(p.text for p in doc.paragraphs)
     if name.endswith(".pdf"):
-        if PdfReader is None:
-            st.error("pypdf not installed. Add `pypdf` to requirements.txt and redeploy.")
+        try:
+            return _pdf_text_pymupdf(data)
+        except Exception:
+            pass  # PyMuPDF missing or failed; fall through to pypdf
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            st.error("No PDF parser installed. Add `pymupdf` (or `pypdf`) to requirements.txt and redeploy.")
             return ""
         file_like = io.BytesIO(data)
         reader = PdfReader(file_like)
@@ -127,20 +146,131 @@ RISKY_PHRASES: Dict[str, str] = {
     r"\bmarried|single|divorced\b": "Family/marital status is protected → remove.",
 }
 
+# All patterns in one case-insensitive alternation so the JD is scanned once
+_RISKY_RE = re.compile(
+    "|".join(f"(?P<g{i}>{p})" for i, p in enumerate(RISKY_PHRASES)),
+    re.IGNORECASE,
+)
+_RISKY_LABELS = [p.strip("\\b") for p in RISKY_PHRASES]
+_ADVICE = list(RISKY_PHRASES.values())
+
+@st.cache_data(show_spinner=False, max_entries=64)
 def compliance_findings(text: str) -> List[Tuple[str, str]]:
+    first: Dict[int, re.Match] = {}
+    for m in _RISKY_RE.finditer(text):
+        idx = int(m.lastgroup[1:])
+        first.setdefault(idx, m)
+        if len(first) == len(_ADVICE):
+            break
     findings = []
-    lowered = text.lower()
-    for pattern, advice in RISKY_PHRASES.items():
-        m = re.search(pattern, lowered)
-        if m:
-            snippet = text[max(0, m.start() - 30): m.end() + 30]
-            findings.append((pattern.strip("\\b"), f"{advice}  Snippet: …{snippet}…"))
+    for idx in sorted(first):
+        m = first[idx]
+        snippet = text[max(0, m.start() - 30): m.end() + 30]
+        findings.append((_RISKY_LABELS[idx], f"{_ADVICE[idx]}  Snippet: …{snippet}…"))
     return findings
 
 # ---------------------------
 # Prompting
 # ---------------------------
 
+JD_TOKEN_THRESHOLD = 2000  # ≈8000 chars; shorter JDs are sent verbatim
+JD_TOKEN_TARGET = 1500
+JD_MIN_COVERAGE = 0.5  # condensing that fills less of the target than this falls back to truncation
+
+@st.cache_resource(show_spinner=False)
+def _load_encoder(model: str):
+    # Raises on failure so nothing is cached; the BPE file is downloaded on first use
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def _get_encoder(model: str):
+    # None if tiktoken is unavailable or offline; lengths then fall back to a ~4 chars/token
+    # estimate, and the next call tries the load again
+    try:
+        return _load_encoder(model)
+    except Exception:
+        return None
+
+def _count_tokens(text: str, enc) -> int:
+    return len(enc.encode(text)) if enc is not None else math.ceil(len(text) / 4)
+
+def trim_to_tokens(text: str, budget: int, enc) -> str:
+    if enc is None:
+        return text[: budget * 4]
+    toks = enc.encode(text)
+    if len(toks) <= budget:
+        return text
+    return enc.decode(toks[:budget])
+
+_WORD_RE = re.compile(r"[a-z][a-z0-9+#\-]{2,}")
+_STOPWORDS = frozenset(
+    "the and for with you your our are will this that from have has can all any who its into "
+    "their they them able such other within across about more than must also well work working "
+    "role team teams company we us".split()
+)
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+")
+
+def _split_oversized(paras: List[str], enc, limit: int) -> List[str]:
+    # Break paragraphs bigger than the whole budget into lines, then sentences, so their
+    # content competes for the budget instead of being skipped outright
+    out = []
+    for p in paras:
+        if _count_tokens(p, enc) <= limit:
+            out.append(p)
+            continue
+        for line in p.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if _count_tokens(line, enc) <= limit:
+                out.append(line)
+                continue
+            # A single sentence still over budget is left whole; it gets skipped below and,
+            # if little else fits, condense_jd falls back to plain truncation
+            out.extend(s.strip() for s in _SENTENCE_RE.split(line) if s.strip())
+    return out
+
+def condense_jd(jd_text: str, model: str = "gpt-4o-mini", target: int = JD_TOKEN_TARGET) -> Tuple[str, str]:
+    """Keep the most keyword-dense paragraphs of a long JD (original order), up to ~target tokens.
+
+    Returns the text and how it was reduced: "verbatim", "condensed" or "truncated".
+    """
+    enc = _get_encoder(model)
+    if _count_tokens(jd_text, enc) <= JD_TOKEN_THRESHOLD:
+        return jd_text, "verbatim"
+    paras = [p.strip() for p in re.split(r"\n\s*\n", jd_text) if p.strip()]
+    if len(paras) < 4:  # PDF text often has no blank lines between paragraphs
+        paras = [p.strip() for p in jd_text.splitlines() if p.strip()]
+    paras = _split_oversized(paras, enc, target)
+
+    para_words = [[w for w in _WORD_RE.findall(p.lower()) if w not in _STOPWORDS] for p in paras]
+    tf = Counter(w for words in para_words for w in words)
+    df = Counter(w for words in para_words for w in set(words))
+    n = len(paras)
+    weight = {w: tf[w] * math.log(1 + n / df[w]) for w in tf}
+
+    scores = [sum(weight[w] for w in words) / (len(words) + 5) for words in para_words]
+    lengths = [_count_tokens(p, enc) for p in paras]
+    keep, used = set(), 0
+    for i in sorted(range(n), key=scores.__getitem__, reverse=True):
+        if used + lengths[i] > target:
+            continue
+        keep.add(i)
+        used += lengths[i] + 1
+    if used < target * JD_MIN_COVERAGE:
+        return trim_to_tokens(jd_text, target, enc), "truncated"
+    return "\n\n".join(paras[i] for i in sorted(keep)), "condensed"
+
+def max_tokens_for(per_section: int) -> int:
+    # ~1400 tokens for the fixed sections (scripts, rubric, scorecard, footer) plus the four
+    # per-section blocks with their follow-ups/cues; the default of 5 gets the old 2400,
+    # and larger packs (up to 3400 at the slider max of 10) get more room than before
+    return 1400 + per_section * 200
+
 def build_system_prompt() -> str:
     return f"""
 You are an expert TA Partner at Neogen Corporation. Write in the {HOUSE_STYLE_NAME}: clear section headers in **bold**, concise bullet points (•), UK English, and a professional but human tone.
@@ -148,7 +278,7 @@ LEGAL COMPLIANCE: Only generate questions that are compliant in both the US and
 Keep questions specific, practical, and evidence-based. Provide brief follow-ups and inline (Good:) and (Red flag:) cues where helpful. Tailor everything strictly to the JD.
 """.strip()
 
-def build_user_prompt(jd_text: str, seniority: str, region: str, per_section: int, include_legal_footer: bool) -> str:
+def build_user_prompt(jd_text: str, seniority: str, region: str, per_section: int, include_legal_footer: bool, model: str = "gpt-4o-mini") -> str:
     legal_footer = "" if not include_legal_footer else (
         "\n\n**Compliance Advisory (for interviewer reference)**\n"
         "• Avoid questions touching protected characteristics or salary history (where restricted).\n"
@@ -156,10 +286,17 @@ def build_user_prompt(jd_text: str, seniority: str, region: str, per_section: in
         "• Focus on essential functions, measurable outcomes, and reasonable accommodations where relevant.\n"
     )
 
+    condensed, how = condense_jd(jd_text, model=model)
+    jd_label = {
+        "verbatim": "verbatim",
+        "condensed": "condensed to its most role-specific paragraphs",
+        "truncated": "truncated to fit the input budget",
+    }[how]
+
     return f"""
-JOB DESCRIPTION (verbatim):
+JOB DESCRIPTION ({jd_label}):
 ---
-{jd_text}
+{condensed}
 ---
 
 Context:
@@ -216,8 +353,67 @@ Formatting notes:
 - No markdown code fences.
 """.strip()
 
-def call_llm(prompt: str, system_prompt: str, model: str = "gpt-4o-mini") -> str:
-    if _client is None:
+LLM_CACHE_DIR = ".llm_cache"
+LLM_CACHE_MAX_ENTRIES = 256
+LLM_CACHE_MAX_AGE = 30 * 86400  # seconds
+TRUNCATED_WARNING = "The model hit its output limit, so the pack is incomplete. Try fewer questions per section and generate again."
+
+def _warn_if_incomplete(finish_reason: str | None) -> None:
+    if finish_reason == "stop":
+        return
+    if finish_reason == "length":
+        st.warning(TRUNCATED_WARNING)
+    else:
+        st.warning(f"The model stopped early (reason: {finish_reason or 'unknown'}), so the pack may be incomplete.")
+
+def _llm_cache_key(prompt: str, system_prompt: str, model: str) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    for part in (model, system_prompt, prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _llm_cache_get(key: str) -> str | None:
+    path = os.path.join(LLM_CACHE_DIR, f"{key}.json")
+    try:
+        if time.time() - os.path.getmtime(path) > LLM_CACHE_MAX_AGE:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get(key)
+    except Exception:
+        return None
+
+def _llm_cache_prune() -> None:
+    # Drop expired entries, then the oldest ones beyond LLM_CACHE_MAX_ENTRIES.
+    # Another session may prune concurrently, so a file vanishing mid-scan is expected.
+    now = time.time()
+    entries = []
+    for entry in os.scandir(LLM_CACHE_DIR):
+        if not entry.name.endswith(".json"):
+            continue
+        with contextlib.suppress(FileNotFoundError):
+            mtime = entry.stat().st_mtime
+            if now - mtime > LLM_CACHE_MAX_AGE:
+                os.remove(entry.path)
+            else:
+                entries.append((mtime, entry.path))
+    entries.sort(reverse=True)
+    for _, path in entries[LLM_CACHE_MAX_ENTRIES:]:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+def _llm_cache_put(key: str, response: str) -> None:
+    try:
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        with open(os.path.join(LLM_CACHE_DIR, f"{key}.json"), "w", encoding="utf-8") as f:
+            json.dump({key: response}, f, ensure_ascii=False)
+        _llm_cache_prune()
+    except Exception:
+        pass  # cache is best-effort
+
+def call_llm(prompt: str, system_prompt: str, model: str = "gpt-4o-mini", max_tokens: int = 2400) -> str:
+    client = _get_client()
+    if client is None:
         # Fallback if no OPENAI_API_KEY set (so the UI still works for demo)
         return (
             "**Introduction (Script, 1–2 mins)**\n"
@@ -245,28 +441,84 @@ def call_llm(prompt: str, system_prompt: str, model: str = "gpt-4o-mini") -> str
             "**Scorecard Template & Notes Page**\n"
             "• Role | Interviewer | Date …\n"
         )
-    resp = _client.chat.completions.create(
+    key = _llm_cache_key(prompt, system_prompt, model)
+    cached = _llm_cache_get(key)
+    if cached is not None:
+        return cached
+    resp = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.4,
+        max_tokens=max_tokens,
+    )
+    content = resp.choices[0].message.content or ""
+    finish_reason = resp.choices[0].finish_reason
+    _warn_if_incomplete(finish_reason)
+    if content and finish_reason == "stop":  # never persist truncated/filtered packs
+        _llm_cache_put(key, content)
+    return content
+
+def stream_llm(prompt: str, system_prompt: str, model: str = "gpt-4o-mini", max_tokens: int = 2400):
+    # Yields the pack as it is generated; cached and demo responses are yielded in one go
+    client = _get_client()
+    if client is None:
+        yield call_llm(prompt, system_prompt, model=model, max_tokens=max_tokens)
+        return
+    key = _llm_cache_key(prompt, system_prompt, model)
+    cached = _llm_cache_get(key)
+    if cached is not None:
+        yield cached
+        return
+    stream = client.chat.completions.create(
         model=model,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": prompt},
         ],
         temperature=0.4,
-        max_tokens=2400,
+        max_tokens=max_tokens,
+        stream=True,
     )
-    return resp.choices[0].message.content or ""
+    parts = []
+    finish_reason = None
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        finish_reason = choice.finish_reason or finish_reason
+        delta = choice.delta.content or ""
+        if delta:
+            parts.append(delta)
+            yield delta
+    _warn_if_incomplete(finish_reason)
+    content = "".join(parts)
+    if content and finish_reason == "stop":  # never persist truncated/filtered packs
+        _llm_cache_put(key, content)
 
 # ---------------------------
 # Formatting helpers
 # ---------------------------
 
 def to_markdown(text: str) -> str:
-    text = re.sub(r"```+", "", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    # Cheap substring checks first; the usual LLM output needs neither rewrite
+    if "```" in text:
+        text = re.sub(r"```+", "", text)
+    if "\n\n\n" in text:
+        text = re.sub(r"\n{3,}", "\n\n", text)
     return text.strip()
 
+_DOCX_HDR = re.compile(r"^\*\*.+\*\*$")
+
+@st.cache_data(show_spinner=False, max_entries=16)
 def to_docx(markdown_like: str) -> bytes:
-    if Document is None:
+    try:
+        from docx import Document
+        from docx.shared import Pt
+        from docx.oxml.ns import qn
+    except ImportError:
         st.error("python-docx not installed. Add `python-docx` to requirements.txt and redeploy.")
         return b""
     doc = Document()
@@ -279,35 +531,27 @@ def to_docx(markdown_like: str) -> bytes:
     except Exception:
         pass
 
-    lines = [ln for ln in markdown_like.split("\n")]
-
-    def add_bullet(p_text: str, level: int = 1):
-        p = doc.add_paragraph(p_text)
+    # Resolve list styles once rather than per bullet line
+    styles = {}
+    for key, style_name in ((1, "List Bullet"), (2, "List Bullet 2")):
         try:
-            if level == 1:
-                p.style = doc.styles["List Bullet"]
-            else:
-                p.style = doc.styles["List Bullet 2"]
-        except Exception:
-            pass
+            styles[key] = doc.styles[style_name]
+        except KeyError:
+            styles[key] = None
 
-    for ln in lines:
+    add_paragraph = doc.add_paragraph
+    for ln in markdown_like.split("\n"):
         s = ln.strip()
         if not s:
-            doc.add_paragraph("")
-            continue
-        if s.startswith("**") and s.endswith("**") and len(s) > 4:
-            hdr = s.strip("*")
-            run = doc.add_paragraph().add_run(hdr)
-            run.bold = True
-            continue
-        if s.startswith("• "):
-            add_bullet(s[2:].strip(), level=1)
-            continue
-        if s.startswith("– ") or s.startswith("- "):
-            add_bullet(s[2:].strip(), level=2)
-            continue
-        doc.add_paragraph(s)
+            add_paragraph("")
+        elif _DOCX_HDR.match(s):
+            add_paragraph().add_run(s.strip("*")).bold = True
+        elif s.startswith("• "):
+            add_paragraph(s[2:].strip(), styles[1])
+        elif s.startswith("– ") or s.startswith("- "):
+            add_paragraph(s[2:].strip(), styles[2])
+        else:
+            add_paragraph(s)
 
     bio = io.BytesIO()
     doc.save(bio)
@@ -317,13 +561,56 @@ def to_docx(markdown_like: str) -> bytes:
 # UI
 # ---------------------------
 
-with st.sidebar:
+@st.fragment
+def docx_download(md: str, base_name: str):
+    # The DOCX is only built once asked for; most users take the Markdown
+    if not st.session_state.get("docx_requested"):
+        if not st.button("Prepare DOCX"):
+            return
+        st.session_state["docx_requested"] = True
+    st.download_button(
+        label="Download as DOCX",
+        data=to_docx(md),
+        file_name=f"{base_name}.docx",
+        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    )
+
+@st.fragment
+def markdown_download(md: str, base_name: str):
+    st.download_button(
+        label="Download as Markdown",
+        data=md.encode("utf-8"),
+        file_name=f"{base_name}.md",
+        mime="text/markdown",
+    )
+
+def pack_key(jd_text: str, *settings) -> str:
+    # Identifies the inputs a generated pack belongs to, so a stale pack is never shown
+    h = hashlib.blake2b(jd_text.encode("utf-8"), digest_size=16)
+    h.update(repr(settings).encode("utf-8"))
+    return h.hexdigest()
+
+def download_panel(md: str):
+    # Each download lives in its own fragment so clicks don't rerun the whole script (and the LLM call)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M")
+    base_name = f"Neogen_Interview_Questions_{stamp}"
+
+    dl_col1, dl_col2 = st.columns(2)
+    with dl_col1:
+        docx_download(md, base_name)
+    with dl_col2:
+        markdown_download(md, base_name)
+
+@st.fragment
+def settings_panel():
+    # Sidebar tweaks only rerun this fragment; the main body reads the values from session_state
     st.subheader("Generation Settings")
-    seniority = st.selectbox("Seniority", ["Entry", "Associate", "Mid", "Senior", "Manager", "Director", "Executive"], index=3)
-    region = st.selectbox("Region / Market Context", ["USA", "Canada", "UK & Ireland", "EMEA", "LATAM", "APAC", "Global"], index=0)
-    per_section = st.slider("Questions per section", 3, 10, 5)
-    model = st.selectbox("Model", ["gpt-4o-mini", "gpt-4o", "gpt-4.1-mini", "gpt-4.1"], index=0)
-    include_legal_footer = st.checkbox("Include Compliance Advisory at end", value=True)
+    st.selectbox("Seniority", ["Entry", "Associate", "Mid", "Senior", "Manager", "Director", "Executive"], index=3, key="seniority")
+    st.selectbox("Region / Market Context", ["USA", "Canada", "UK & Ireland", "EMEA", "LATAM", "APAC", "Global"], index=0, key="region")
+    st.slider("Questions per section", 3, 10, 5, key="per_section")
+    st.selectbox("Model", ["gpt-4o-mini", "gpt-4o", "gpt-4.1-mini", "gpt-4.1"], index=0, key="model")
+    st.checkbox("Include Compliance Advisory at end", value=True, key="include_legal_footer")
+    st.checkbox("Stream output as it is generated", value=True, key="stream_output")
     st.write(":information_source: Uses your OPENAI_API_KEY from environment.")
 
     if st.button("Clear inputs", type="secondary"):
@@ -331,19 +618,7 @@ with st.sidebar:
             del st.session_state[k]
         st.rerun()
 
-col1, col2 = st.columns(2)
-with col1:
-    upload = st.file_uploader("Upload Job Description (TXT, DOCX, PDF, MD)", type=["txt", "docx", "pdf", "md"])
-with col2:
-    jd_text_area = st.text_area("…or paste Job Description text", height=280)
-
-jd_text = ""
-if upload is not None:
-    jd_text = extract_text_from_upload(upload)
-if not jd_text:
-    jd_text = jd_text_area
-
-if jd_text:
+def jd_panel(jd_text: str):
     st.success("Job Description received.")
 
     # Compliance preflight
@@ -358,6 +633,36 @@ if jd_text:
     with st.expander("Preview extracted JD text"):
         st.text(jd_text[:4000] + ("\n…" if len(jd_text) > 4000 else ""))
 
+with st.sidebar:
+    settings_panel()
+
+seniority = st.session_state["seniority"]
+region = st.session_state["region"]
+per_section = st.session_state["per_section"]
+model = st.session_state["model"]
+include_legal_footer = st.session_state["include_legal_footer"]
+stream_output = st.session_state["stream_output"]
+
+col1, col2 = st.columns(2)
+with col1:
+    upload = st.file_uploader("Upload Job Description (TXT, DOCX, PDF, MD)", type=["txt", "docx", "pdf", "md"])
+with col2:
+    jd_text_area = st.text_area("…or paste Job Description text", height=280)
+
+jd_text = ""
+if upload is not None:
+    jd_text = extract_text_from_upload(upload)
+if not jd_text:
+    jd_text = jd_text_area
+
+current_pack_key = pack_key(jd_text, seniority, region, per_section, include_legal_footer, model)
+if st.session_state.get("pack_key") != current_pack_key:
+    for k in ("pack_md", "pack_key", "docx_requested"):
+        st.session_state.pop(k, None)
+
+if jd_text:
+    jd_panel(jd_text)
+
     gen_col1, gen_col2, gen_col3 = st.columns([1,1,1])
     with gen_col1:
         generate_btn = st.button("Generate Interview Pack", type="primary")
@@ -367,34 +672,25 @@ if jd_text:
         st.write("")
 
     if generate_btn:
-        with st.spinner("Generating in Neogen house style…"):
-            system_prompt = build_system_prompt()
-            user_prompt = build_user_prompt(jd_text, seniority, region, per_section, include_legal_footer)
-            output = call_llm(user_prompt, system_prompt, model=model)
-            md = to_markdown(output)
-
+        system_prompt = build_system_prompt()
+        user_prompt = build_user_prompt(jd_text, seniority, region, per_section, include_legal_footer, model=model)
         st.subheader("Interview Pack Preview")
-        st.markdown(md)
-
-        # Downloads
-        docx_bytes = to_docx(md)
-        stamp = datetime.now().strftime("%Y%m%d_%H%M")
-        base_name = f"Neogen_Interview_Questions_{stamp}"
-
-        dl_col1, dl_col2 = st.columns(2)
-        with dl_col1:
-            st.download_button(
-                label="Download as DOCX",
-                data=docx_bytes,
-                file_name=f"{base_name}.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            )
-        with dl_col2:
-            st.download_button(
-                label="Download as Markdown",
-                data=md.encode("utf-8"),
-                file_name=f"{base_name}.md",
-                mime="text/markdown",
-            )
+        if stream_output:
+            output = st.write_stream(stream_llm(user_prompt, system_prompt, model=model, max_tokens=max_tokens_for(per_section)))
+        else:
+            with st.spinner("Generating in Neogen house style…"):
+                output = call_llm(user_prompt, system_prompt, model=model, max_tokens=max_tokens_for(per_section))
+        md = to_markdown(output)
+        st.session_state["pack_md"] = md
+        st.session_state["pack_key"] = current_pack_key
+        st.session_state.pop("docx_requested", None)
+        if not stream_output:
+            st.markdown(md)
+    elif "pack_md" in st.session_state:
+        st.subheader("Interview Pack Preview")
+        st.markdown(st.session_state["pack_md"])
+
+    if "pack_md" in st.session_state:
+        download_panel(st.session_state["pack_md"])
 else:
     st.info("Upload or paste a Job Description to begin.")